@@ -1,12 +1,94 @@
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.io as pio
 import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs_version
 import json
+import gzip
+import html
+from string import Template
+from concurrent.futures import ProcessPoolExecutor
 import os
 
 # --- CONFIGURACIÓN GLOBAL ---
 
+# Serialización JSON de las figuras con orjson (implementado en C) cuando está instalado
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    pio.json.config.default_engine = 'json'
+
+# Columnas del CSV que usan los gráficos
+USECOLS = [
+    'Razón social',
+    'Macrosector',
+    'Tipo de propiedad (Privada, Pública, Mixta)',
+    '¿Es empresa familiar? Si/No',
+    '¿Cotiza en bolsa? Si/No',
+    '¿Multinacional? Si/No',
+    'Año de fundación',
+    'Ingresos operacionales',
+    'Bloque',
+    'Nombre Pilar',
+    'Ponderación Materialidad',
+    'Valoración',
+    'valoracionPonderada',
+]
+
+# Tipos explícitos: categorías para las columnas de baja cardinalidad y float32 para las valoraciones
+DTYPES = {
+    'Macrosector': 'category',
+    'Nombre Pilar': 'category',
+    'Bloque': 'category',
+    'Razón social': 'category',
+    '¿Multinacional? Si/No': 'category',
+    '¿Cotiza en bolsa? Si/No': 'category',
+    'Tipo de propiedad (Privada, Pública, Mixta)': 'category',
+    '¿Es empresa familiar? Si/No': 'category',
+    'valoracionPonderada': 'float32',
+    'Valoración': 'float32',
+    # Llegan como texto ('14%', valores no numéricos) y se convierten al cargar
+    'Ingresos operacionales': 'str',
+    'Año de fundación': 'str',
+    'Ponderación Materialidad': 'str',
+}
+
+CSV_PATH = 'empresasEafit.csv'
+PARQUET_PATH = 'empresasEafit.parquet'
+
+# Versión de la limpieza de load_data: incrementarla al cambiar sus pasos para invalidar la caché
+CACHE_VERSION = 1
+# Clave guardada en los metadatos del Parquet; si no coincide, la caché se regenera
+CACHE_KEY = json.dumps({'version': CACHE_VERSION, 'usecols': USECOLS, 'dtypes': DTYPES}, sort_keys=True)
+
+def load_data():
+    """
+    Carga el dataset de empresas.
+    Usa la caché Parquet si es más reciente que el CSV y fue escrita con las mismas
+    columnas, tipos y limpieza (CACHE_KEY); si no, lee el CSV, limpia las columnas
+    numéricas y regenera la caché.
+    """
+    if os.path.exists(PARQUET_PATH) and os.path.getmtime(CSV_PATH) <= os.path.getmtime(PARQUET_PATH):
+        cached = pd.read_parquet(PARQUET_PATH)
+        if cached.attrs.pop('cache_key', None) == CACHE_KEY:
+            return cached
+
+    df = pd.read_csv(CSV_PATH, usecols=USECOLS, dtype=DTYPES, engine='c')
+
+    # Limpiezas numéricas que antes repetían los gráficos 05, 11 y 13 (vectorizadas, una sola vez)
+    materiality = df['Ponderación Materialidad'].str.strip().str.rstrip('%')
+    df['Ingresos operacionales'] = pd.to_numeric(df['Ingresos operacionales'], errors='coerce').fillna(0).astype('float32')
+    df['Año de fundación'] = pd.to_numeric(df['Año de fundación'], errors='coerce')
+    df['Ponderación Materialidad'] = pd.to_numeric(materiality, errors='coerce').fillna(0).astype('float32')
+    df['Valoración'] = df['Valoración'].fillna(0).astype('float32')
+
+    df.attrs['cache_key'] = CACHE_KEY
+    df.to_parquet(PARQUET_PATH, compression='zstd')
+    df.attrs.pop('cache_key')
+    return df
+
 def setup_environment():
     """
     Carga los datos, el tema de la marca y crea el directorio de salida.
@@ -19,7 +101,7 @@ def setup_environment():
 
     try:
         # Cargar el dataset de empresas
-        df = pd.read_csv('empresasEafit.csv')
+        df = load_data()
         
         # Cargar la identidad de marca desde el JSON
         with open('eafitBrand.json', 'r', encoding='utf-8') as f:
@@ -29,7 +111,19 @@ def setup_environment():
         print(f"Error: No se encontró el archivo {e.filename}. Asegúrate de que los archivos 'empresasEafit.csv' y 'eafitBrand.json' estén en el mismo directorio.")
         return None, None
 
-    # --- Creación del Tema de Plotly ---
+    register_brand_template(brand_config)
+    
+    print("Entorno configurado exitosamente.")
+    return df, brand_config
+
+# Layout base de las figuras; se construye al registrar el tema de la marca
+BASE_LAYOUT = None
+
+def register_brand_template(brand_config):
+    """
+    Crea el tema de Plotly a partir de la marca EAFIT y lo activa como predeterminado.
+    También se usa para inicializar los procesos trabajadores.
+    """
     chart_colors = brand_config['colorPalette']['chartColors']
     eafit_template = go.layout.Template()
     eafit_template.layout.font = {
@@ -52,45 +146,113 @@ def setup_environment():
     # Registrar y activar el tema
     pio.templates['eafit_brand'] = eafit_template
     pio.templates.default = 'eafit_brand'
-    
-    print("Entorno configurado exitosamente.")
-    return df, brand_config
+
+    # Layout base compartido por las figuras go.Figure (se valida una sola vez por proceso)
+    global BASE_LAYOUT
+    BASE_LAYOUT = go.Layout(template='eafit_brand')
+
+# Estilos de la página de cada gráfico (se muestran dentro de iframes en index.html).
+# write_html no admite CSS propio, así que se inyectan con el post_script.
+CHART_STYLE_SCRIPT = (
+    "var style = document.createElement('style');"
+    "style.textContent = 'body { margin: 0; padding: 0; overflow: hidden; }"
+    " .js-plotly-plot .plotly .modebar { right: 5px !important; top: 5px !important; }';"
+    "document.head.appendChild(style);"
+)
+
+# Si GZIP_HTML=1, cada gráfico se escribe también como '.html.gz' para servidores que acepten gzip
+GZIP_HTML = os.environ.get('GZIP_HTML', '0') == '1'
 
 def save_chart_as_html(fig, filename):
     """
-    Guarda una figura de Plotly como un archivo HTML autocontenido en la carpeta 'charts'.
-    """
-    # Generar el HTML del gráfico
-    html_div = pio.to_html(fig, full_html=False, include_plotlyjs=False)
-    
-    # Crear el contenido del archivo HTML completo
-    full_html = f"""
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-        <style>
-            body {{ margin: 0; padding: 0; overflow: hidden; }}
-            .js-plotly-plot .plotly .modebar {{ right: 5px !important; top: 5px !important; }}
-        </style>
-    </head>
-    <body>
-        {html_div}
-    </body>
-    </html>
+    Guarda una figura de Plotly como un archivo HTML en la carpeta 'charts'.
+    plotly.js se carga desde la CDN; opcionalmente se escribe una copia comprimida con gzip.
+    Retorna la figura serializada para el dashboard de página única.
     """
-    
-    # Guardar el archivo
     filepath = os.path.join('charts', filename)
+    page = fig.to_html(include_plotlyjs='cdn', full_html=True, post_script=CHART_STYLE_SCRIPT)
     with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(full_html)
+        f.write(page)
+    if GZIP_HTML:
+        with gzip.open(filepath + '.gz', 'wt', compresslevel=6, encoding='utf-8') as gz:
+            gz.write(page)
     print(f"Gráfico guardado en: {filepath}")
+    return serialize_fig(fig)
+
+def serialize_fig(fig):
+    """Serializa la figura (data + layout) a JSON para incrustarla en el dashboard."""
+    return fig.to_json()
+
+# Página única con todos los gráficos: cada uno se dibuja solo cuando entra en pantalla
+DASHBOARD_TEMPLATE = Template('''<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <title>Dashboard de Sostenibilidad EAFIT</title>
+    <script charset="utf-8" src="$plotly_cdn"></script>
+    <style>
+        body { margin: 0 auto; max-width: 1200px; padding: 16px; }
+        .chart { min-height: 450px; margin-bottom: 32px; }
+    </style>
+</head>
+<body>
+$charts
+<script>
+    var observer = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (!entry.isIntersecting) return;
+            var el = entry.target;
+            observer.unobserve(el);
+            var fig = JSON.parse(el.dataset.fig);
+            el.removeAttribute('data-fig');
+            Plotly.newPlot(el, fig.data, fig.layout, {responsive: true});
+        });
+    }, {rootMargin: '200px'});
+    document.querySelectorAll('.chart[data-fig]').forEach(function (el) { observer.observe(el); });
+</script>
+</body>
+</html>
+''')
+
+def save_dashboard(figures, filename='dashboard.html'):
+    """
+    Escribe en 'charts' una sola página con todas las figuras serializadas.
+    plotly.js se carga una vez y cada gráfico se renderiza de forma perezosa.
+    """
+    filepath = os.path.join('charts', filename)
+    charts = '\n'.join(
+        f'<div id="chart_{i:02d}" class="chart" data-fig="{html.escape(fig_json)}"></div>'
+        for i, fig_json in enumerate(figures, start=1)
+    )
+    page = DASHBOARD_TEMPLATE.substitute(
+        plotly_cdn=f'https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js',
+        charts=charts)
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(page)
+    print(f"Dashboard guardado en: {filepath}")
+
+def cat_mean(df, key_col, val_col='valoracionPonderada'):
+    """
+    Media de val_col por categoría de key_col usando los códigos categóricos y np.bincount.
+    Equivale a groupby(key_col, observed=True)[val_col].mean(): ignora claves y valores nulos.
+    """
+    cat = df[key_col].cat
+    codes = cat.codes.to_numpy()
+    vals = df[val_col].to_numpy(np.float32)
+    n = len(cat.categories)
+    has_key = codes >= 0
+    valid = has_key & ~np.isnan(vals)
+    present = np.bincount(codes[has_key], minlength=n) > 0
+    sums = np.bincount(codes[valid], weights=vals[valid], minlength=n)
+    counts = np.bincount(codes[valid], minlength=n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = (sums / counts).astype(np.float32)
+    return pd.Series(means[present], index=cat.categories[present].rename(key_col), name=val_col)
 
 # --- FUNCIONES DE GENERACIÓN DE GRÁFICOS ---
 
-def generate_chart_01_radar_macroeconomic(df):
+def generate_chart_01_radar_macroeconomic(radar_data):
     """1. Radar de Desempeño por Macrosector."""
-    radar_data = df.groupby(['Macrosector', 'Nombre Pilar'])['valoracionPonderada'].mean().reset_index()
     fig = px.line_polar(radar_data,
                         r='valoracionPonderada',
                         theta='Nombre Pilar',
@@ -102,59 +264,52 @@ def generate_chart_01_radar_macroeconomic(df):
         legend={'orientation': 'h', 'yanchor': 'bottom', 'y': -0.4, 'xanchor': 'center', 'x': 0.5},
         margin=dict(b=150)
     )
-    save_chart_as_html(fig, '01_radar_macroeconomic.html')
+    return save_chart_as_html(fig, '01_radar_macroeconomic.html')
 
-def generate_chart_02_bar_performance_by_pillar(df):
+def generate_chart_02_bar_performance_by_pillar(by_pillar):
     """2. Desempeño Promedio General por Pilar."""
-    data = df.groupby('Nombre Pilar')['valoracionPonderada'].mean().sort_values(ascending=False).reset_index()
-    fig = px.bar(data, 
-                 x='Nombre Pilar', 
-                 y='valoracionPonderada', 
-                 title='Desempeño Promedio por Pilar de Sostenibilidad',
-                 labels={'valoracionPonderada': 'Valoración Ponderada Media (%)', 'Nombre Pilar': 'Pilar de Sostenibilidad'},
-                 text_auto='.2f')
-    fig.update_traces(textangle=0, textposition="outside")
-    save_chart_as_html(fig, '02_bar_performance_by_pillar.html')
-
-def generate_chart_03_treemap_companies_by_sector(df):
+    data = by_pillar.sort_values(ascending=False)
+    fig = go.Figure(go.Bar(
+        x=data.index,
+        y=data.to_numpy(),
+        texttemplate='%{y:.2f}',
+        textposition='outside',
+        textangle=0,
+        hovertemplate='Pilar de Sostenibilidad=%{x}<br>Valoración Ponderada Media (%)=%{y}<extra></extra>'
+    ), layout=BASE_LAYOUT)
+    fig.update_layout(title='Desempeño Promedio por Pilar de Sostenibilidad',
+                      xaxis_title='Pilar de Sostenibilidad',
+                      yaxis_title='Valoración Ponderada Media (%)')
+    return save_chart_as_html(fig, '02_bar_performance_by_pillar.html')
+
+def generate_chart_03_treemap_companies_by_sector(companies):
     """3. Distribución de Empresas por Macrosector."""
-    data = df.groupby('Macrosector')['Razón social'].nunique().reset_index()
+    counts = companies['Macrosector'].value_counts()
+    data = counts[counts > 0].reset_index()
+    data['_root'] = 'Todos los Sectores'
     fig = px.treemap(data, 
-                     path=[px.Constant("Todos los Sectores"), 'Macrosector'], 
-                     values='Razón social',
-                     title='Distribución de Empresas Analizadas por Macrosector')
+                     path=['_root', 'Macrosector'], 
+                     values='count',
+                     title='Distribución de Empresas Analizadas por Macrosector',
+                     labels={'count': 'Número de Empresas'})
     fig.update_traces(textinfo="label+value+percent root")
-    save_chart_as_html(fig, '03_treemap_companies_by_sector.html')
+    return save_chart_as_html(fig, '03_treemap_companies_by_sector.html')
 
-def generate_chart_04_box_performance_distribution(df):
+def generate_chart_04_box_performance_distribution(pillar_scores):
     """4. Distribución del Desempeño por Pilar."""
-    fig = px.box(df, 
+    fig = px.box(pillar_scores, 
                  x='Nombre Pilar', 
                  y='valoracionPonderada',
                  title='Distribución de la Valoración por Pilar',
                  labels={'valoracionPonderada': 'Valoración Ponderada (%)', 'Nombre Pilar': 'Pilar de Sostenibilidad'},
-                 points="all")
+                 points="outliers")
     fig.update_xaxes(tickangle=45)
-    save_chart_as_html(fig, '04_box_performance_distribution.html')
+    return save_chart_as_html(fig, '04_box_performance_distribution.html')
 
-def generate_chart_05_scatter_income_vs_performance(df):
+def generate_chart_05_scatter_income_vs_performance(company_performance):
     """5. Relación entre Ingresos y Desempeño en Sostenibilidad."""
-    df_chart = df.copy()
-    
-    # CORRECCIÓN: Convertir la columna de ingresos a tipo numérico.
-    # 'errors='coerce'' convierte los valores no numéricos en NaN (Not a Number).
-    df_chart['Ingresos operacionales'] = pd.to_numeric(df_chart['Ingresos operacionales'], errors='coerce')
-    # Rellenar los valores NaN con 0 para poder agrupar.
-    df_chart['Ingresos operacionales'].fillna(0, inplace=True)
-
-    company_performance = df_chart.groupby('Razón social').agg(
-        total_performance=('valoracionPonderada', 'sum'),
-        income=('Ingresos operacionales', 'first'),
-        macrosector=('Macrosector', 'first')
-    ).reset_index()
-    
     # Filtrar datos con ingresos > 0 para poder usar la escala logarítmica.
-    plot_data = company_performance[company_performance['income'] > 0]
+    plot_data = company_performance.loc[company_performance['income'] > 0].reset_index()
     
     fig = px.scatter(plot_data, 
                      x='income', 
@@ -165,110 +320,108 @@ def generate_chart_05_scatter_income_vs_performance(df):
                      title='Ingresos Operacionales vs. Desempeño Total en Sostenibilidad',
                      labels={'income': 'Ingresos Operacionales (escala log)', 'total_performance': 'Suma de Valoración Ponderada', 'macrosector': 'Macrosector'},
                      log_x=True)
-    save_chart_as_html(fig, '05_scatter_income_vs_performance.html')
+    return save_chart_as_html(fig, '05_scatter_income_vs_performance.html')
+
+def build_category_comparison_bar(data, category_label, title):
+    """Barras de valoración media por categoría: una traza (y un color) por categoría."""
+    fig = go.Figure([
+        go.Bar(
+            x=[category],
+            y=[value],
+            name=str(category),
+            legendgroup=str(category),
+            texttemplate='%{y:.2f}',
+            hovertemplate=f'{category_label}=%{{x}}<br>Valoración Ponderada Media (%)=%{{y}}<extra></extra>'
+        )
+        for category, value in data.items()
+    ], layout=BASE_LAYOUT)
+    fig.update_layout(title=title,
+                      xaxis_title=category_label,
+                      yaxis_title='Valoración Ponderada Media (%)',
+                      legend_title_text=category_label,
+                      barmode='relative')
+    return fig
 
-def generate_chart_06_bar_multinational_comparison(df):
+def generate_chart_06_bar_multinational_comparison(data):
     """6. Comparativa de Desempeño: Multinacionales vs. Nacionales."""
-    data = df.groupby('¿Multinacional? Si/No')['valoracionPonderada'].mean().reset_index()
-    fig = px.bar(data, 
-                 x='¿Multinacional? Si/No', 
-                 y='valoracionPonderada',
-                 color='¿Multinacional? Si/No',
-                 title='Desempeño Promedio: Multinacional vs. Nacional',
-                 labels={'valoracionPonderada': 'Valoración Ponderada Media (%)', '¿Multinacional? Si/No': 'Tipo de Empresa'},
-                 text_auto='.2f')
-    save_chart_as_html(fig, '06_bar_multinational_comparison.html')
+    fig = build_category_comparison_bar(data, 'Tipo de Empresa',
+                                        'Desempeño Promedio: Multinacional vs. Nacional')
+    return save_chart_as_html(fig, '06_bar_multinational_comparison.html')
 
-def generate_chart_07_bar_listed_comparison(df):
+def generate_chart_07_bar_listed_comparison(data):
     """7. Comparativa: Empresas que cotizan en bolsa vs. las que no."""
-    data = df.groupby('¿Cotiza en bolsa? Si/No')['valoracionPonderada'].mean().reset_index()
-    fig = px.bar(data, 
-                 x='¿Cotiza en bolsa? Si/No', 
-                 y='valoracionPonderada',
-                 color='¿Cotiza en bolsa? Si/No',
-                 title='Desempeño: Cotiza en Bolsa vs. No Cotiza',
-                 labels={'valoracionPonderada': 'Valoración Ponderada Media (%)', '¿Cotiza en bolsa? Si/No': '¿Cotiza en Bolsa?'},
-                 text_auto='.2f')
-    save_chart_as_html(fig, '07_bar_listed_comparison.html')
+    fig = build_category_comparison_bar(data, '¿Cotiza en Bolsa?',
+                                        'Desempeño: Cotiza en Bolsa vs. No Cotiza')
+    return save_chart_as_html(fig, '07_bar_listed_comparison.html')
 
-def generate_chart_08_sunburst_blocks_and_pillars(df):
+def generate_chart_08_sunburst_blocks_and_pillars(data):
     """8. Desglose Jerárquico por Bloque y Pilar."""
-    data = df.groupby(['Bloque', 'Nombre Pilar'])['valoracionPonderada'].mean().reset_index()
     fig = px.sunburst(data, 
                       path=['Bloque', 'Nombre Pilar'], 
                       values='valoracionPonderada',
                       title='Desempeño Jerárquico: Bloques y Pilares')
-    save_chart_as_html(fig, '08_sunburst_blocks_and_pillars.html')
+    return save_chart_as_html(fig, '08_sunburst_blocks_and_pillars.html')
 
-def generate_chart_09_bar_top10_companies(df):
+def generate_chart_09_bar_top10_companies(by_company_sum):
     """9. Top 10 Empresas por Desempeño Total."""
-    company_performance = df.groupby('Razón social')['valoracionPonderada'].sum().sort_values(ascending=False).head(10).reset_index()
-    fig = px.bar(company_performance, 
-                 y='Razón social', 
-                 x='valoracionPonderada',
-                 orientation='h',
-                 title='Top 10 Empresas por Desempeño en Sostenibilidad',
-                 labels={'valoracionPonderada': 'Suma de Valoración Ponderada', 'Razón social': 'Empresa'},
-                 text='valoracionPonderada')
-    fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-    fig.update_layout(yaxis={'categoryorder':'total ascending'})
-    save_chart_as_html(fig, '09_bar_top10_companies.html')
-
-def generate_chart_10_bar_bottom10_companies(df):
+    company_performance = by_company_sum.nlargest(10)
+    fig = go.Figure(go.Bar(
+        y=company_performance.index,
+        x=company_performance.to_numpy(),
+        orientation='h',
+        text=company_performance.to_numpy(),
+        texttemplate='%{text:.2f}',
+        textposition='outside',
+        hovertemplate='Suma de Valoración Ponderada=%{text}<br>Empresa=%{y}<extra></extra>'
+    ), layout=BASE_LAYOUT)
+    fig.update_layout(title='Top 10 Empresas por Desempeño en Sostenibilidad',
+                      xaxis_title='Suma de Valoración Ponderada',
+                      yaxis_title='Empresa',
+                      yaxis={'categoryorder': 'total ascending'})
+    return save_chart_as_html(fig, '09_bar_top10_companies.html')
+
+def generate_chart_10_bar_bottom10_companies(by_company_sum):
     """10. Últimas 10 Empresas por Desempeño Total."""
-    company_performance = df.groupby('Razón social')['valoracionPonderada'].sum().sort_values(ascending=True).head(10).reset_index()
-    fig = px.bar(company_performance, 
-                 y='Razón social', 
-                 x='valoracionPonderada',
-                 orientation='h',
-                 title='Últimas 10 Empresas por Desempeño en Sostenibilidad',
-                 labels={'valoracionPonderada': 'Suma de Valoración Ponderada', 'Razón social': 'Empresa'},
-                 text='valoracionPonderada')
-    fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-    fig.update_layout(yaxis={'categoryorder':'total descending'})
-    save_chart_as_html(fig, '10_bar_bottom10_companies.html')
-    
-def generate_chart_11_histogram_foundation_year(df):
+    company_performance = by_company_sum.nsmallest(10)
+    fig = go.Figure(go.Bar(
+        y=company_performance.index,
+        x=company_performance.to_numpy(),
+        orientation='h',
+        text=company_performance.to_numpy(),
+        texttemplate='%{text:.2f}',
+        textposition='outside',
+        hovertemplate='Suma de Valoración Ponderada=%{text}<br>Empresa=%{y}<extra></extra>'
+    ), layout=BASE_LAYOUT)
+    fig.update_layout(title='Últimas 10 Empresas por Desempeño en Sostenibilidad',
+                      xaxis_title='Suma de Valoración Ponderada',
+                      yaxis_title='Empresa',
+                      yaxis={'categoryorder': 'total descending'})
+    return save_chart_as_html(fig, '10_bar_bottom10_companies.html')
+
+def generate_chart_11_histogram_foundation_year(companies):
     """11. Distribución de Empresas por Año de Fundación."""
-    df_chart = df.copy()
-    
-    # CORRECCIÓN: Asegurar que el año de fundación sea numérico.
-    df_chart['Año de fundación'] = pd.to_numeric(df_chart['Año de fundación'], errors='coerce')
-    df_chart.dropna(subset=['Año de fundación'], inplace=True) # Eliminar filas sin año válido
-    
-    unique_companies = df_chart.drop_duplicates(subset='Razón social')
-    fig = px.histogram(unique_companies, 
+    # Eliminar empresas sin año válido (ya convertido a número al cargar los datos)
+    fig = px.histogram(companies.dropna(subset=['Año de fundación']), 
                        x='Año de fundación',
                        title='Distribución de Empresas por Antigüedad (Año de Fundación)',
                        labels={'Año de fundación': 'Año de Fundación'},
                        nbins=20)
-    save_chart_as_html(fig, '11_histogram_foundation_year.html')
+    return save_chart_as_html(fig, '11_histogram_foundation_year.html')
 
-def generate_chart_12_pie_property_type(df):
+def generate_chart_12_pie_property_type(companies):
     """12. Proporción de Empresas por Tipo de Propiedad."""
-    data = df.groupby('Tipo de propiedad (Privada, Pública, Mixta)')['Razón social'].nunique().reset_index()
+    data = companies['Tipo de propiedad (Privada, Pública, Mixta)'].value_counts().reset_index()
     fig = px.pie(data, 
                  names='Tipo de propiedad (Privada, Pública, Mixta)', 
-                 values='Razón social',
+                 values='count',
                  title='Proporción de Empresas por Tipo de Propiedad',
+                 labels={'count': 'Número de Empresas'},
                  hole=0.3)
     fig.update_traces(textposition='inside', textinfo='percent+label')
-    save_chart_as_html(fig, '12_pie_property_type.html')
+    return save_chart_as_html(fig, '12_pie_property_type.html')
 
-def generate_chart_13_heatmap_materiality_vs_performance(df):
+def generate_chart_13_heatmap_materiality_vs_performance(heatmap_data):
     """13. Mapa de Calor: Materialidad vs. Desempeño por Pilar."""
-    df_chart = df.copy()
-    
-    # CORRECCIÓN: Limpiar y convertir columnas a tipo numérico.
-    df_chart['Ponderación Materialidad'] = df_chart['Ponderación Materialidad'].astype(str).str.replace('%', '', regex=False)
-    df_chart['Ponderación Materialidad'] = pd.to_numeric(df_chart['Ponderación Materialidad'], errors='coerce').fillna(0)
-    df_chart['Valoración'] = pd.to_numeric(df_chart['Valoración'], errors='coerce').fillna(0)
-
-    heatmap_data = df_chart.groupby('Nombre Pilar').agg(
-        mean_performance=('Valoración', 'mean'),
-        mean_materiality=('Ponderación Materialidad', 'mean')
-    ).reset_index()
-    
     fig = px.scatter(heatmap_data,
                      x='mean_materiality',
                      y='mean_performance',
@@ -282,35 +435,38 @@ def generate_chart_13_heatmap_materiality_vs_performance(df):
                          'mean_performance': 'Desempeño Medio en Valoración (%)'
                      })
     fig.update_traces(textposition='top center')
-    save_chart_as_html(fig, '13_scatter_materiality_vs_performance.html')
+    return save_chart_as_html(fig, '13_scatter_materiality_vs_performance.html')
 
-def generate_chart_14_bar_performance_by_macrosector(df):
+def generate_chart_14_bar_performance_by_macrosector(by_macro):
     """14. Desempeño Promedio por Macrosector."""
-    data = df.groupby('Macrosector')['valoracionPonderada'].mean().sort_values(ascending=False).reset_index()
-    fig = px.bar(data, 
-                 x='Macrosector', 
-                 y='valoracionPonderada', 
-                 title='Ranking de Desempeño Promedio por Macrosector',
-                 labels={'valoracionPonderada': 'Valoración Ponderada Media (%)', 'Macrosector': 'Macrosector'},
-                 text_auto='.2f')
-    fig.update_traces(textangle=0, textposition="outside")
-    save_chart_as_html(fig, '14_bar_performance_by_macrosector.html')
-
-def generate_chart_15_bar_family_business_comparison(df):
+    data = by_macro.sort_values(ascending=False)
+    fig = go.Figure(go.Bar(
+        x=data.index,
+        y=data.to_numpy(),
+        texttemplate='%{y:.2f}',
+        textposition='outside',
+        textangle=0,
+        hovertemplate='Macrosector=%{x}<br>Valoración Ponderada Media (%)=%{y}<extra></extra>'
+    ), layout=BASE_LAYOUT)
+    fig.update_layout(title='Ranking de Desempeño Promedio por Macrosector',
+                      xaxis_title='Macrosector',
+                      yaxis_title='Valoración Ponderada Media (%)')
+    return save_chart_as_html(fig, '14_bar_performance_by_macrosector.html')
+
+def generate_chart_15_bar_family_business_comparison(data):
     """15. Comparativa: Empresas Familiares vs. No Familiares."""
-    data = df.groupby('¿Es empresa familiar? Si/No')['valoracionPonderada'].mean().reset_index()
-    fig = px.bar(data, 
-                 x='¿Es empresa familiar? Si/No', 
-                 y='valoracionPonderada',
-                 color='¿Es empresa familiar? Si/No',
-                 title='Desempeño Promedio: Empresa Familiar vs. No Familiar',
-                 labels={'valoracionPonderada': 'Valoración Ponderada Media (%)', '¿Es empresa familiar? Si/No': '¿Es Empresa Familiar?'},
-                 text_auto='.2f')
-    save_chart_as_html(fig, '15_bar_family_business_comparison.html')
+    fig = build_category_comparison_bar(data, '¿Es Empresa Familiar?',
+                                        'Desempeño Promedio: Empresa Familiar vs. No Familiar')
+    return save_chart_as_html(fig, '15_bar_family_business_comparison.html')
 
 
 # --- EJECUCIÓN PRINCIPAL ---
 
+def _dispatch(task):
+    """Ejecuta una tarea (función generadora, argumento) en un proceso trabajador."""
+    fn, arg = task
+    return fn(arg)
+
 def main():
     """
     Función principal que ejecuta la generación de todos los gráficos.
@@ -318,24 +474,60 @@ def main():
     df, brand_config = setup_environment()
     
     if df is not None and brand_config is not None:
+        # Agregaciones de cada gráfico, calculadas aquí para no enviar el DataFrame completo a los trabajadores
+        by_macro_pillar = df.groupby(['Macrosector', 'Nombre Pilar'], observed=True)['valoracionPonderada'].mean().reset_index()
+        by_pillar = cat_mean(df, 'Nombre Pilar')
+        by_macro = cat_mean(df, 'Macrosector')
+        by_multinational = cat_mean(df, '¿Multinacional? Si/No')
+        by_listed = cat_mean(df, '¿Cotiza en bolsa? Si/No')
+        by_family = cat_mean(df, '¿Es empresa familiar? Si/No')
+        by_block_pillar = df.groupby(['Bloque', 'Nombre Pilar'], observed=True)['valoracionPonderada'].mean().reset_index()
+        company_performance = df.groupby('Razón social', observed=True).agg(
+            total_performance=('valoracionPonderada', 'sum'),
+            income=('Ingresos operacionales', 'first'),
+            macrosector=('Macrosector', 'first')
+        )
+        by_company_sum = company_performance['total_performance']
+        # Una sola pasada de groupby sobre el bloque float32 de las dos columnas
+        materiality_by_pillar = (df.groupby('Nombre Pilar', observed=True)[['Valoración', 'Ponderación Materialidad']]
+                                   .mean()
+                                   .rename(columns={'Valoración': 'mean_performance',
+                                                    'Ponderación Materialidad': 'mean_materiality'})
+                                   .reset_index())
+        # Solo las dos columnas que necesita el diagrama de cajas (una fila por registro)
+        pillar_scores = df[['Nombre Pilar', 'valoracionPonderada']]
+        # Vista de una fila por empresa para los gráficos que cuentan empresas
+        companies = df.drop_duplicates(subset='Razón social', ignore_index=True)[
+            ['Razón social', 'Macrosector', 'Año de fundación',
+             'Tipo de propiedad (Privada, Pública, Mixta)', 'Ingresos operacionales']]
+
+        tasks = [
+            (generate_chart_01_radar_macroeconomic, by_macro_pillar),
+            (generate_chart_02_bar_performance_by_pillar, by_pillar),
+            (generate_chart_03_treemap_companies_by_sector, companies),
+            (generate_chart_04_box_performance_distribution, pillar_scores),
+            (generate_chart_05_scatter_income_vs_performance, company_performance),
+            (generate_chart_06_bar_multinational_comparison, by_multinational),
+            (generate_chart_07_bar_listed_comparison, by_listed),
+            (generate_chart_08_sunburst_blocks_and_pillars, by_block_pillar),
+            (generate_chart_09_bar_top10_companies, by_company_sum),
+            (generate_chart_10_bar_bottom10_companies, by_company_sum),
+            (generate_chart_11_histogram_foundation_year, companies),
+            (generate_chart_12_pie_property_type, companies),
+            (generate_chart_13_heatmap_materiality_vs_performance, materiality_by_pillar),
+            (generate_chart_14_bar_performance_by_macrosector, by_macro),
+            (generate_chart_15_bar_family_business_comparison, by_family),
+        ]
+
         print("\n--- Iniciando generación de gráficos ---")
-        generate_chart_01_radar_macroeconomic(df)
-        generate_chart_02_bar_performance_by_pillar(df)
-        generate_chart_03_treemap_companies_by_sector(df)
-        generate_chart_04_box_performance_distribution(df)
-        generate_chart_05_scatter_income_vs_performance(df)
-        generate_chart_06_bar_multinational_comparison(df)
-        generate_chart_07_bar_listed_comparison(df)
-        generate_chart_08_sunburst_blocks_and_pillars(df)
-        generate_chart_09_bar_top10_companies(df)
-        generate_chart_10_bar_bottom10_companies(df)
-        generate_chart_11_histogram_foundation_year(df)
-        generate_chart_12_pie_property_type(df)
-        generate_chart_13_heatmap_materiality_vs_performance(df)
-        generate_chart_14_bar_performance_by_macrosector(df)
-        generate_chart_15_bar_family_business_comparison(df)
+        # Los gráficos son independientes: se generan en paralelo, registrando el tema en cada trabajador
+        with ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                 initializer=register_brand_template,
+                                 initargs=(brand_config,)) as executor:
+            figures = list(executor.map(_dispatch, tasks))
+        save_dashboard(figures)
         print("\n--- Proceso de generación de gráficos completado. ---")
-        print(f"Se han creado 15 archivos .html en la carpeta '{os.path.join(os.getcwd(), 'charts')}'")
+        print(f"Se han creado 15 archivos .html y el dashboard.html en la carpeta '{os.path.join(os.getcwd(), 'charts')}'")
 
 if __name__ == '__main__':
     main()
@@ -1,17 +1,12 @@
-import seaborn as sns
+import plotly.express as px
 import plotly.graph_objs as go
 
-# Load data
-tips = sns.load_dataset("tips")
+if __name__ == '__main__':
+    # Load data
+    tips = px.data.tips()
 
-# Save the plot as an HTML file
-sns_plot = sns.scatterplot(x="total_bill", y="tip", hue="sex", data=tips)
+    # Build the Plotly scatter, coloring markers by sex
+    plotly_fig = go.Figure(data=go.Scatter(x=tips["total_bill"], y=tips["tip"], mode="markers", marker=dict(color=tips["sex"].astype("category").cat.codes)))
 
-# Save the seaborn plot to a file
-sns_plot.get_figure().savefig("seaborn_plot.png")
-
-# Convert plot to Plotly object
-plotly_fig = go.Figure(data=go.Scatter(x=tips["total_bill"], y=tips["tip"], mode="markers", marker=dict(color=tips["sex"].cat.codes)))
-
-# Export Plotly object to HTML file
-plotly_fig.write_html("seaborn_plot.html")
+    # Export Plotly object to HTML file
+    plotly_fig.write_html("tips_scatter.html")